@@ -0,0 +1,115 @@
+# This code is part of Ansible, but is an independent component.
+# This particular file snippet, and this file snippet only, is BSD licensed.
+# Modules you write using this snippet, which is embedded dynamically by Ansible
+# still belong to the author of the module, and may assign their own license
+# to the complete work.
+#
+# Copyright (c), Alain Dejoux <adejoux@djouxtech.net>, 2016
+# All rights reserved.
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+#    * Redistributions of source code must retain the above copyright
+#      notice, this list of conditions and the following disclaimer.
+#    * Redistributions in binary form must reproduce the above copyright notice,
+#      this list of conditions and the following disclaimer in the documentation
+#      and/or other materials provided with the distribution.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND
+# ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED
+# WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED.
+# IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT,
+# INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO,
+# PROCUREMENT OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS
+# INTERRUPTION) HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT
+# LIABILITY, OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE
+# USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+"""Helpers to parse AIX LVM commands output.
+
+They are shared by the aix_lvol module and its action plugin.
+"""
+
+import pipes
+import re
+
+_LV_VG_RE = re.compile(r"LOGICAL VOLUME:\s+\w+\s+VOLUME GROUP:\s+(\w+)")
+_LV_LPS_RE = re.compile(r"LPs:\s+(\d+).*PPs")
+_LV_PPSIZE_RE = re.compile(r"PP SIZE:\s+(\d+)")
+_LV_POLICY_RE = re.compile(r"INTER-POLICY:\s+(\w+)")
+
+_VG_NAME_RE = re.compile(r"VOLUME GROUP:\s+(\w+)")
+_VG_TOTAL_RE = re.compile(r"TOTAL PP.*\((\d+)")
+_VG_PPSIZE_RE = re.compile(r"PP SIZE:\s+(\d+)")
+_VG_FREE_RE = re.compile(r"FREE PP.*\((\d+)")
+
+_UNIT_MULT = {'M': 1, 'G': 1024, 'T': 1024 * 1024}
+
+# separates the lsvg and lslv outputs of a combined probe, followed by the lsvg exit status
+PROBE_SEP = '__LVOL_SEP__'
+
+
+def to_megabytes(size):
+    """Convert a size with one of the [MGT] units to megabytes."""
+    try:
+        multiplier = _UNIT_MULT[size[-1].upper()]
+    except (KeyError, IndexError):
+        raise ValueError("No valid size unit specified.")
+
+    return int(size[:-1]) * multiplier
+
+
+def round_ppsize(x, base=16):
+    return -(-int(x) // base) * base
+
+
+def parse_lv(data, name):
+    match = _LV_VG_RE.search(data)
+    if match is None:
+        return None
+
+    vg = match.group(1)
+    lps = int(_LV_LPS_RE.search(data).group(1))
+    pp_size = int(_LV_PPSIZE_RE.search(data).group(1))
+    policy = _LV_POLICY_RE.search(data).group(1)
+
+    size = lps * pp_size
+
+    return {'name': name, 'vg': vg, 'size': size, 'pp_size': pp_size, 'policy': policy}
+
+
+def parse_vg(data):
+    match = _VG_NAME_RE.search(data)
+    if match is None:
+        return None
+
+    name = match.group(1)
+    size = int(_VG_TOTAL_RE.search(data).group(1))
+    pp_size = int(_VG_PPSIZE_RE.search(data).group(1))
+    free = int(_VG_FREE_RE.search(data).group(1))
+
+    return {'name': name, 'size': size, 'free': free, 'pp_size': pp_size}
+
+
+def probe_command(vg, lv, lsvg_cmd='lsvg', lslv_cmd='lslv'):
+    """Build a shell command querying both a volume group and a logical volume.
+
+    Both commands are run with -L so they do not wait for the volume group lock.
+    """
+    return "%s -L %s; echo %s $?; %s -L %s" % (lsvg_cmd, pipes.quote(vg), PROBE_SEP, lslv_cmd, pipes.quote(lv))
+
+
+def split_probe(out):
+    """Split the output of the probe_command() shell command.
+
+    Returns the lsvg exit status, the lsvg output and the lslv output, or
+    None if the separator is missing.
+    """
+    if PROBE_SEP not in out:
+        return None
+
+    vg_info, lv_info = out.split(PROBE_SEP, 1)
+    vg_rc, dummy, lv_info = lv_info.partition('\n')
+
+    return int(vg_rc), vg_info, lv_info
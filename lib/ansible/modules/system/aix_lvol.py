@@ -73,7 +73,11 @@ options:
     - shrink if current size is higher than size requested
     required: false
     default: yes
-
+notes:
+  - This module is backed by an action plugin which checks the logical volume with lslv before running the module.
+    As a consequence, it does not support C(async).
+  - The action plugin keeps the volume group details in the C(aix_lvol_vg_cache) host fact for 60 seconds,
+    so consecutive tasks on the same volume group do not run lsvg again. This fact is stored in the fact cache when one is configured.
 '''
 
 EXAMPLES = '''
@@ -141,82 +145,35 @@ msg:
 '''
 
 from ansible.module_utils.basic import AnsibleModule
-import re
+from ansible.module_utils.aix_lvm import parse_lv, parse_vg, probe_command, round_ppsize, split_probe, to_megabytes
+import pipes
+import shlex
+
+# echoed after each successful command when several changes are chained
+STEP_SEP = '__LVOL_STEP__'
 
 
 def convert_size(module, size):
-    unit = size[-1].upper()
-    units = ['M', 'G', 'T']
     try:
-        multiplier = 1024**units.index(unit)
+        return to_megabytes(size)
     except ValueError:
         module.fail_json(msg="No valid size unit specified.")
 
-    return int(size[:-1]) * multiplier
-
-
-def round_ppsize(x, base=16):
-    new_size = int(base * round(float(x) / base))
-    if new_size < x:
-        new_size += base
-    return new_size
-
-
-def parse_lv(data):
-    name = None
-
-    for line in data.splitlines():
-        match = re.search("LOGICAL VOLUME:\s+(\w+)\s+VOLUME GROUP:\s+(\w+)", line)
-        if match is not None:
-            name = match.group(1)
-            vg = match.group(2)
-            continue
-        match = re.search("LPs:\s+(\d+).*PPs", line)
-        if match is not None:
-            lps = int(match.group(1))
-            continue
-        match = re.search("PP SIZE:\s+(\d+)", line)
-        if match is not None:
-            pp_size = int(match.group(1))
-            continue
-        match = re.search("INTER-POLICY:\s+(\w+)", line)
-        if match is not None:
-            policy = match.group(1)
-            continue
-
-    if not name:
-        return None
-
-    size = lps * pp_size
-
-    return {'name': name, 'vg': vg, 'size': size, 'policy': policy}
 
+def probe_lvm(module, lsvg_cmd, lslv_cmd, vg, lv):
+    """Run lsvg and lslv in a single shell to spare one process launch.
 
-def parse_vg(data):
+    The lsvg exit status is echoed after the separator line, a missing
+    logical volume is detected by parse_lv on the lslv output.
+    """
+    rc, out, err = module.run_command(probe_command(vg, lv, lsvg_cmd, lslv_cmd), use_unsafe_shell=True)
 
-    for line in data.splitlines():
+    probe = split_probe(out)
+    if probe is None:
+        module.fail_json(msg="Unable to query volume group %s and logical volume %s." % (vg, lv), rc=rc, out=out, err=err)
 
-        match = re.search("VOLUME GROUP:\s+(\w+)", line)
-        if match is not None:
-            name = match.group(1)
-            continue
-
-        match = re.search("TOTAL PP.*\((\d+)", line)
-        if match is not None:
-            size = int(match.group(1))
-            continue
-
-        match = re.search("PP SIZE:\s+(\d+)", line)
-        if match is not None:
-            pp_size = int(match.group(1))
-            continue
-
-        match = re.search("FREE PP.*\((\d+)", line)
-        if match is not None:
-            free = int(match.group(1))
-            continue
-
-    return {'name': name, 'size': size, 'free': free, 'pp_size': pp_size}
+    vg_rc, vg_info, lv_info = probe
+    return vg_rc, vg_info, lv_info, err
 
 
 def main():
@@ -231,7 +188,8 @@ def main():
             state=dict(choices=["absent", "present"], default='present'),
             shrink=dict(type='bool', default='yes'),
             policy=dict(choices=["maximum", "minimum"], default='maximum'),
-            pvs=dict(type='list', default=list())
+            pvs=dict(type='list', default=list()),
+            vg_info=dict(type='dict', default=None),  # Internal use only, volume group details cached by the action plugin
         ),
         supports_check_mode=True,
     )
@@ -246,108 +204,135 @@ def main():
     state = module.params['state']
     shrink = module.boolean(module.params['shrink'])
     pvs = module.params['pvs']
-
-    pv_list = ' '.join(pvs)
+    this_vg = module.params['vg_info']
 
     if policy == 'maximum':
         lv_policy = 'x'
     else:
         lv_policy = 'm'
 
-    # Add echo command when running in check-mode
-    if module.check_mode:
-        test_opt = 'echo '
-    else:
-        test_opt = ''
-
     # check if system commands are available
-    lsvg_cmd = module.get_bin_path("lsvg", required=True)
     lslv_cmd = module.get_bin_path("lslv", required=True)
 
-    # Get information on volume group requested
-    rc, vg_info, err = module.run_command("%s %s" % (lsvg_cmd, vg))
+    if state == 'absent':
+        # Removal only needs lslv to know whether the logical volume exists in the volume group.
+        rc, out, err = module.run_command([lslv_cmd, '-L', lv])
+        this_lv = None
+        if rc == 0:
+            this_lv = parse_lv(out, lv)
 
-    if rc != 0:
-        if state == 'absent':
-            module.exit_json(changed=False, msg="Volume group %s does not exist." % vg)
+        if this_lv is None:
+            module.exit_json(changed=False, msg="Logical Volume %s does not exist." % lv)
+
+        if vg != this_lv['vg']:
+            module.exit_json(changed=False, msg="Logical volume %s does not exist in volume group %s." % (lv, vg))
+
+        # remove LV
+        rmlv_cmd = module.get_bin_path("rmlv", required=True)
+        if module.check_mode:
+            module.exit_json(changed=True, msg="Logical volume %s deleted." % lv)
+        rc, out, err = module.run_command([rmlv_cmd, '-f', lv])
+        if rc == 0:
+            module.exit_json(changed=True, msg="Logical volume %s deleted." % lv)
         else:
+            module.fail_json(msg="Failed to remove logical volume %s." % lv, rc=rc, out=out, err=err)
+
+    cached_vg = this_vg is not None
+    if cached_vg:
+        # Volume group details were already gathered, only query the logical volume.
+        lv_info = module.run_command([lslv_cmd, '-L', lv])[1]
+    else:
+        lsvg_cmd = module.get_bin_path("lsvg", required=True)
+
+        # Get information on volume group and logical volume requested
+        rc, vg_info, lv_info, err = probe_lvm(module, lsvg_cmd, lslv_cmd, vg, lv)
+
+        if rc != 0:
             module.fail_json(msg="Volume group %s does not exist." % vg, rc=rc, out=vg_info, err=err)
 
-    this_vg = parse_vg(vg_info)
+        this_vg = parse_vg(vg_info)
 
     if size is not None:
         # Calculate pp size and round it up based on pp size.
         lv_size = round_ppsize(convert_size(module, size), base=this_vg['pp_size'])
 
-    # Get information on logical volume requested
-    rc, lv_info, err = module.run_command(
-        "%s %s" % (lslv_cmd, lv))
+    this_lv = parse_lv(lv_info, lv)
 
-    if rc != 0:
-        if state == 'absent':
-            module.exit_json(changed=False, msg="Logical Volume %s does not exist." % lv)
+    if this_lv is None:
+        if not size:
+            module.fail_json(msg="No size given.")
 
-    changed = False
+        if lv_size > this_vg['free'] and cached_vg:
+            # cached details may be outdated if space was freed since, check again before failing.
+            lsvg_cmd = module.get_bin_path("lsvg", required=True)
+            rc, vg_info, err = module.run_command([lsvg_cmd, '-L', vg])
+            if rc != 0:
+                module.fail_json(msg="Volume group %s does not exist." % vg, rc=rc, out=vg_info, err=err)
 
-    this_lv = parse_lv(lv_info)
+            this_vg = parse_vg(vg_info)
+            lv_size = round_ppsize(convert_size(module, size), base=this_vg['pp_size'])
 
-    if state == 'present' and not size:
-        if this_lv is None:
-            module.fail_json(msg="No size given.")
+        if lv_size > this_vg['free']:
+            module.fail_json(msg="Not enough free space in volume group %s: %s MB free." % (this_vg['name'], this_vg['free']))
 
-    if this_lv is None:
-        if state == 'present':
-            if lv_size > this_vg['free']:
-                module.fail_json(msg="Not enough free space in volume group %s: %s MB free." % (this_vg['name'], this_vg['free']))
-
-            # create LV
-            mklv_cmd = module.get_bin_path("mklv", required=True)
-
-            cmd = "%s %s -t %s -y %s -c %s  -e %s %s %s %sM %s" % (test_opt, mklv_cmd, lv_type, lv, copies, lv_policy, opts, vg, lv_size, pv_list)
-            rc, out, err = module.run_command(cmd)
-            if rc == 0:
-                module.exit_json(changed=True, msg="Logical volume %s created." % lv)
-            else:
-                module.fail_json(msg="Creating logical volume %s failed." % lv, rc=rc, out=out, err=err)
-    else:
-        if state == 'absent':
-            # remove LV
-            rmlv_cmd = module.get_bin_path("rmlv", required=True)
-            rc, out, err = module.run_command("%s %s -f %s" % (test_opt, rmlv_cmd, this_lv['name']))
-            if rc == 0:
-                module.exit_json(changed=True, msg="Logical volume %s deleted." % lv)
-            else:
-                module.fail_json(msg="Failed to remove logical volume %s." % lv, rc=rc, out=out, err=err)
+        # create LV
+        mklv_cmd = module.get_bin_path("mklv", required=True)
+
+        cmd = [mklv_cmd, '-t', lv_type, '-y', lv, '-c', copies, '-e', lv_policy] + shlex.split(opts) + [vg, '%sM' % lv_size] + pvs
+        if module.check_mode:
+            module.exit_json(changed=True, msg="Logical volume %s created." % lv)
+        rc, out, err = module.run_command(cmd)
+        if rc == 0:
+            module.exit_json(changed=True, msg="Logical volume %s created." % lv)
         else:
-            if this_lv['policy'] != policy:
-                # change lv allocation policy
-                chlv_cmd = module.get_bin_path("chlv", required=True)
-                rc, out, err = module.run_command("%s %s -e %s %s" % (test_opt, chlv_cmd, lv_policy, this_lv['name']))
-                if rc == 0:
-                    module.exit_json(changed=True, msg="Logical volume %s policy changed: %s." % (lv, policy))
-                else:
-                    module.fail_json(msg="Failed to change logical volume %s policy." % lv, rc=rc, out=out, err=err)
-
-            if vg != this_lv['vg']:
-                module.fail_json(msg="Logical volume %s already exist in volume group %s" % (lv, this_lv['vg']))
-
-            # from here the last remaining action is to resize it, if no size parameter is passed we do nothing.
+            module.fail_json(msg="Creating logical volume %s failed." % lv, rc=rc, out=out, err=err)
+    else:
+        if vg != this_lv['vg']:
+            module.fail_json(msg="Logical volume %s already exist in volume group %s" % (lv, this_lv['vg']))
+
+        # collect the changes to apply so they run in a single remote process
+        cmds = []
+        msgs = []
+        fail_msgs = []
+
+        if this_lv['policy'] != policy:
+            # change lv allocation policy
+            chlv_cmd = module.get_bin_path("chlv", required=True)
+            cmds.append([chlv_cmd, '-e', lv_policy, this_lv['name']])
+            msgs.append("Logical volume %s policy changed: %s." % (lv, policy))
+            fail_msgs.append("Failed to change logical volume %s policy." % lv)
+
+        # resize LV based on absolute values, if no size parameter is passed we do not resize.
+        if size and int(lv_size) > this_lv['size']:
+            extendlv_cmd = module.get_bin_path("extendlv", required=True)
+            cmds.append([extendlv_cmd, lv, '%sM' % (lv_size - this_lv['size'])])
+            msgs.append("Logical volume %s size extended to %sMB." % (lv, lv_size))
+            fail_msgs.append("Unable to resize %s to %sMB." % (lv, lv_size))
+        elif size and shrink and lv_size < this_lv['size']:
+            module.fail_json(msg="No shrinking of Logical Volume %s permitted. Current size: %s MB" % (lv, this_lv['size']))
+
+        if not cmds:
             if not size:
                 module.exit_json(changed=False, msg="Logical volume %s already exist." % (lv))
+            module.exit_json(changed=False, msg="Logical volume %s size is already %sMB or higher." % (lv, lv_size))
+
+        if module.check_mode:
+            module.exit_json(changed=True, msg=' '.join(msgs))
 
-            # resize LV based on absolute values
-            if int(lv_size) > this_lv['size']:
-                extendlv_cmd = module.get_bin_path("extendlv", required=True)
-                cmd = "%s %s %s %sM" % (test_opt, extendlv_cmd, lv, lv_size - this_lv['size'])
-                rc, out, err = module.run_command(cmd)
-                if rc == 0:
-                    module.exit_json(changed=True, msg="Logical volume %s size extended to %sMB." % (lv, lv_size))
-                else:
-                    module.fail_json(msg="Unable to resize %s to %sMB." % (lv, lv_size), rc=rc, out=out, err=err)
-            elif shrink and lv_size < this_lv['size']:
-                module.fail_json(msg="No shrinking of Logical Volume %s permitted. Current size: %s MB" % (lv, this_lv['size']))
-            else:
-                module.exit_json(changed=False, msg="Logical volume %s size is already %sMB or higher." % (lv, lv_size))
+        if len(cmds) == 1:
+            rc, out, err = module.run_command(cmds[0])
+            done = 0
+        else:
+            # a separator is echoed after each successful command to tell which one failed
+            cmd = (' && echo %s && ' % STEP_SEP).join(' '.join(pipes.quote(arg) for arg in c) for c in cmds)
+            rc, out, err = module.run_command(cmd, use_unsafe_shell=True)
+            done = out.count(STEP_SEP)
+            out = out.replace(STEP_SEP + '\n', '')
+
+        if rc == 0:
+            module.exit_json(changed=True, msg=' '.join(msgs))
+        else:
+            module.fail_json(msg=' '.join(msgs[:done] + [fail_msgs[done]]), changed=done > 0, rc=rc, out=out, err=err)
 
 
 if __name__ == '__main__':
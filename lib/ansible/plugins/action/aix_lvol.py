@@ -0,0 +1,142 @@
+# (c) 2017, Alain Dejoux <adejoux@djouxtech.net>
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import time
+
+from ansible.compat.six.moves import shlex_quote
+from ansible.constants import mk_boolean as boolean
+from ansible.module_utils._text import to_text
+from ansible.module_utils.aix_lvm import parse_lv, parse_vg, probe_command, round_ppsize, split_probe, to_megabytes
+from ansible.plugins.action import ActionBase
+
+# lsvg output is kept in this host fact so that consecutive tasks working on
+# the same volume group do not query it again.
+VG_CACHE_FACT = 'aix_lvol_vg_cache'
+VG_CACHE_TTL = 60
+
+
+class ActionModule(ActionBase):
+
+    TRANSFERS_FILES = False
+
+    def run(self, tmp=None, task_vars=None):
+        ''' handler for aix_lvol operations '''
+        if task_vars is None:
+            task_vars = dict()
+
+        result = super(ActionModule, self).run(tmp, task_vars)
+
+        args = self._task.args
+        vg = self._text_arg('vg')
+        lv = self._text_arg('lv')
+
+        # facts belong to the inventory host, not to the one we delegate to
+        use_cache = not self._task.delegate_to
+
+        cache = {}
+        if use_cache:
+            cache = dict(task_vars.get(VG_CACHE_FACT) or {})
+
+        this_vg = cache.get(vg)
+        if this_vg is not None and time.time() - this_vg['time'] > VG_CACHE_TTL:
+            this_vg = None
+
+        msg = None
+        if self._text_arg('state', 'present') == 'present' and vg and lv:
+            if this_vg is None:
+                res = self._low_level_execute_command(probe_command(vg, lv))
+                lv_info = ''
+                try:
+                    probe = split_probe(res['stdout'])
+                except ValueError:
+                    probe = None
+                if probe is not None:
+                    vg_rc, vg_info, lv_info = probe
+                    if vg_rc == 0:
+                        try:
+                            this_vg = parse_vg(vg_info)
+                        except (AttributeError, ValueError):
+                            pass
+                        if this_vg is not None:
+                            this_vg['time'] = time.time()
+                            cache[vg] = this_vg
+            else:
+                res = self._low_level_execute_command('lslv -L %s' % shlex_quote(lv))
+                lv_info = res['stdout']
+
+            # An existing logical volume already in the requested state is the
+            # common idempotent case: answer it from the lslv output instead of
+            # shipping and running the whole module.
+            if res['rc'] == 0:
+                msg = self._check_unchanged(vg, lv, lv_info)
+        else:
+            this_vg = None
+
+        if msg is not None:
+            result['changed'] = False
+            result['msg'] = msg
+        else:
+            module_args = args.copy()
+            if this_vg is not None:
+                module_args['vg_info'] = dict((k, this_vg[k]) for k in ('name', 'size', 'free', 'pp_size'))
+            result.update(self._execute_module(module_name='aix_lvol', module_args=module_args, task_vars=task_vars))
+
+            # free space is no longer accurate. Facts of failed results are
+            # discarded, so there is no point in doing the same on failure.
+            if result.get('changed'):
+                cache.pop(vg, None)
+
+        if use_cache:
+            result['ansible_facts'] = {VG_CACHE_FACT: cache}
+
+        return result
+
+    def _text_arg(self, name, default=None):
+        ''' returns a task argument as text, as it is passed to the module '''
+        value = self._task.args.get(name, default)
+        if value is None:
+            return None
+        return to_text(value)
+
+    def _check_unchanged(self, vg, lv, lv_info):
+        ''' returns a message if the module would not change anything, None otherwise '''
+        try:
+            this_lv = parse_lv(lv_info, lv)
+        except (AttributeError, ValueError):
+            return None
+
+        if this_lv is None or this_lv['vg'] != vg:
+            return None
+
+        if this_lv['policy'] != self._text_arg('policy', 'maximum'):
+            return None
+
+        size = self._text_arg('size')
+        if not size:
+            return "Logical volume %s already exist." % lv
+
+        try:
+            lv_size = round_ppsize(to_megabytes(size), base=this_lv['pp_size'])
+        except (TypeError, ValueError):
+            return None
+
+        if lv_size == this_lv['size'] or (lv_size < this_lv['size'] and not boolean(self._task.args.get('shrink', 'yes'))):
+            return "Logical volume %s size is already %sMB or higher." % (lv, lv_size)
+
+        return None
@@ -0,0 +1,99 @@
+# (c) 2017, Alain Dejoux <adejoux@djouxtech.net>
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+
+from ansible.compat.tests import unittest
+from ansible.module_utils.aix_lvm import parse_lv, parse_vg, probe_command, round_ppsize, split_probe, to_megabytes
+
+
+fixture_path = os.path.join(os.path.dirname(__file__), 'fixtures', 'aix_lvm')
+fixture_data = {}
+
+
+def load_fixture(name):
+    path = os.path.join(fixture_path, name)
+
+    if path not in fixture_data:
+        with open(path) as f:
+            fixture_data[path] = f.read()
+
+    return fixture_data[path]
+
+
+class TestParseLv(unittest.TestCase):
+
+    def test_parse_lv(self):
+        self.assertEqual(parse_lv(load_fixture('lslv_testlv.txt'), 'testlv'),
+                         {'name': 'testlv', 'vg': 'testvg', 'size': 512, 'pp_size': 16, 'policy': 'maximum'})
+
+    def test_parse_lv_not_found(self):
+        self.assertIsNone(parse_lv(load_fixture('lslv_not_found.txt'), 'testlv'))
+        self.assertIsNone(parse_lv('', 'testlv'))
+
+
+class TestParseVg(unittest.TestCase):
+
+    def test_parse_vg(self):
+        self.assertEqual(parse_vg(load_fixture('lsvg_testvg.txt')),
+                         {'name': 'testvg', 'size': 10208, 'free': 9696, 'pp_size': 16})
+
+    def test_parse_vg_not_found(self):
+        self.assertIsNone(parse_vg(load_fixture('lsvg_not_found.txt')))
+        self.assertIsNone(parse_vg(''))
+
+
+class TestSizes(unittest.TestCase):
+
+    def test_to_megabytes(self):
+        self.assertEqual(to_megabytes('512M'), 512)
+        self.assertEqual(to_megabytes('2g'), 2048)
+        self.assertEqual(to_megabytes('1T'), 1024 * 1024)
+
+    def test_to_megabytes_invalid(self):
+        for size in ('', '5', '1.5G', '10K', 'M'):
+            self.assertRaises(ValueError, to_megabytes, size)
+
+    def test_round_ppsize(self):
+        self.assertEqual(round_ppsize(512, base=16), 512)
+        self.assertEqual(round_ppsize(500, base=16), 512)
+        self.assertEqual(round_ppsize(513, base=16), 528)
+        self.assertEqual(round_ppsize(1, base=64), 64)
+        self.assertEqual(round_ppsize(0, base=64), 0)
+        self.assertEqual(round_ppsize(100), 112)
+
+
+class TestProbe(unittest.TestCase):
+
+    def test_probe_command(self):
+        self.assertEqual(probe_command('testvg', 'test lv'), "lsvg -L testvg; echo __LVOL_SEP__ $?; lslv -L 'test lv'")
+        self.assertEqual(probe_command('testvg', 'testlv', '/usr/sbin/lsvg', '/usr/sbin/lslv'),
+                         "/usr/sbin/lsvg -L testvg; echo __LVOL_SEP__ $?; /usr/sbin/lslv -L testlv")
+
+    def test_split_probe(self):
+        lsvg = load_fixture('lsvg_testvg.txt')
+        lslv = load_fixture('lslv_testlv.txt')
+        self.assertEqual(split_probe(lsvg + "__LVOL_SEP__ 0\n" + lslv), (0, lsvg, lslv))
+
+    def test_split_probe_missing_vg(self):
+        self.assertEqual(split_probe("__LVOL_SEP__ 1\n"), (1, '', ''))
+
+    def test_split_probe_without_separator(self):
+        self.assertIsNone(split_probe(''))
@@ -0,0 +1,180 @@
+# (c) 2017, Alain Dejoux <adejoux@djouxtech.net>
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import json
+import os
+
+from ansible.compat.tests import unittest
+from ansible.compat.tests.mock import patch
+from ansible.errors import AnsibleModuleExit
+from ansible.modules.system import aix_lvol
+from ansible.module_utils import basic
+from ansible.module_utils._text import to_bytes
+
+
+def set_module_args(args):
+    args = json.dumps({'ANSIBLE_MODULE_ARGS': args})
+    basic._ANSIBLE_ARGS = to_bytes(args)
+
+fixture_path = os.path.join(os.path.dirname(__file__), '..', '..', 'module_utils', 'fixtures', 'aix_lvm')
+fixture_data = {}
+
+
+def load_fixture(name):
+    path = os.path.join(fixture_path, name)
+
+    if path not in fixture_data:
+        with open(path) as f:
+            fixture_data[path] = f.read()
+
+    return fixture_data[path]
+
+
+def exit_json(module, **kwargs):
+    kwargs.setdefault('changed', False)
+    raise AnsibleModuleExit(kwargs)
+
+
+def fail_json(module, **kwargs):
+    kwargs['failed'] = True
+    raise AnsibleModuleExit(kwargs)
+
+
+class TestAixLvolModule(unittest.TestCase):
+
+    def setUp(self):
+        # responses of the LVM commands, by command name
+        self.responses = {}
+        self.commands = []
+
+        self.mock_module = patch.multiple(basic.AnsibleModule,
+                                          exit_json=exit_json,
+                                          fail_json=fail_json,
+                                          get_bin_path=lambda module, name, required=False: '/usr/sbin/%s' % name,
+                                          run_command=self._run_command)
+        self.mock_module.start()
+
+    def tearDown(self):
+        self.mock_module.stop()
+
+    def _run_command(self, cmd, use_unsafe_shell=False):
+        self.commands.append(cmd)
+        if not isinstance(cmd, list):
+            cmd = cmd.split()
+        return self.responses.get(os.path.basename(cmd[0]), (0, '', ''))
+
+    def command_names(self):
+        names = []
+        for cmd in self.commands:
+            if not isinstance(cmd, list):
+                cmd = cmd.split()
+            names.append(os.path.basename(cmd[0]))
+        return names
+
+    def execute_module(self, failed=False, changed=False):
+        with self.assertRaises(AnsibleModuleExit) as exc:
+            aix_lvol.main()
+
+        result = exc.exception.result
+
+        if failed:
+            self.assertTrue(result.get('failed'), result)
+        else:
+            self.assertFalse(result.get('failed'), result)
+            self.assertEqual(result['changed'], changed, result)
+
+        return result
+
+    def test_absent_removes_lv(self):
+        set_module_args(dict(vg='testvg', lv='testlv', state='absent'))
+        self.responses['lslv'] = (0, load_fixture('lslv_testlv.txt'), '')
+        result = self.execute_module(changed=True)
+        self.assertEqual(result['msg'], 'Logical volume testlv deleted.')
+        self.assertEqual(self.commands[-1], ['/usr/sbin/rmlv', '-f', 'testlv'])
+
+    def test_absent_lv_in_other_vg(self):
+        set_module_args(dict(vg='testvg', lv='testlv', state='absent'))
+        lslv = load_fixture('lslv_testlv.txt').replace('VOLUME GROUP:   testvg', 'VOLUME GROUP:   othervg')
+        self.responses['lslv'] = (0, lslv, '')
+        result = self.execute_module(changed=False)
+        self.assertIn('does not exist in volume group testvg', result['msg'])
+        self.assertNotIn('rmlv', self.command_names())
+
+    def test_absent_lv_not_found(self):
+        set_module_args(dict(vg='testvg', lv='testlv', state='absent'))
+        self.responses['lslv'] = (1, '', load_fixture('lslv_not_found.txt'))
+        result = self.execute_module(changed=False)
+        self.assertIn('does not exist', result['msg'])
+        self.assertEqual(self.command_names(), ['lslv'])
+
+    def test_present_rechecks_outdated_cached_vg(self):
+        vg_info = dict(name='testvg', size=10208, free=50, pp_size=16)
+        set_module_args(dict(vg='testvg', lv='newlv', size='100M', vg_info=vg_info))
+        self.responses['lslv'] = (1, '', load_fixture('lslv_not_found.txt'))
+        self.responses['lsvg'] = (0, load_fixture('lsvg_testvg.txt'), '')
+        result = self.execute_module(changed=True)
+        self.assertEqual(result['msg'], 'Logical volume newlv created.')
+        self.assertEqual(self.command_names(), ['lslv', 'lsvg', 'mklv'])
+        self.assertEqual(self.commands[1], ['/usr/sbin/lsvg', '-L', 'testvg'])
+
+    def test_present_fails_when_fresh_vg_is_too_small(self):
+        vg_info = dict(name='testvg', size=10208, free=50, pp_size=16)
+        set_module_args(dict(vg='testvg', lv='newlv', size='100G', vg_info=vg_info))
+        self.responses['lslv'] = (1, '', load_fixture('lslv_not_found.txt'))
+        self.responses['lsvg'] = (0, load_fixture('lsvg_testvg.txt'), '')
+        result = self.execute_module(failed=True)
+        self.assertEqual(result['msg'], 'Not enough free space in volume group testvg: 9696 MB free.')
+        self.assertNotIn('mklv', self.command_names())
+
+    def test_present_trusts_cached_vg_with_enough_space(self):
+        vg_info = dict(name='testvg', size=10208, free=9696, pp_size=16)
+        set_module_args(dict(vg='testvg', lv='newlv', size='100M', vg_info=vg_info))
+        self.responses['lslv'] = (1, '', load_fixture('lslv_not_found.txt'))
+        self.execute_module(changed=True)
+        self.assertEqual(self.command_names(), ['lslv', 'mklv'])
+
+    def _set_policy_and_size_change(self):
+        # testlv is 512MB with a maximum policy, both need to change. The chained
+        # command line starts with chlv, so the 'chlv' response is the one of the whole chain.
+        set_module_args(dict(vg='testvg', lv='testlv', size='1G', policy='minimum'))
+        probe = load_fixture('lsvg_testvg.txt') + '__LVOL_SEP__ 0\n' + load_fixture('lslv_testlv.txt')
+        self.responses['lsvg'] = (0, probe, '')
+
+    def test_present_chained_changes_succeed(self):
+        self._set_policy_and_size_change()
+        self.responses['chlv'] = (0, '__LVOL_STEP__\n', '')
+        result = self.execute_module(changed=True)
+        self.assertEqual(result['msg'], 'Logical volume testlv policy changed: minimum. Logical volume testlv size extended to 1024MB.')
+        self.assertEqual(self.commands[-1], '/usr/sbin/chlv -e m testlv && echo __LVOL_STEP__ && /usr/sbin/extendlv testlv 512M')
+
+    def test_present_chained_chlv_fails(self):
+        self._set_policy_and_size_change()
+        self.responses['chlv'] = (1, '', 'chlv failed')
+        result = self.execute_module(failed=True)
+        self.assertEqual(result['msg'], 'Failed to change logical volume testlv policy.')
+        self.assertFalse(result['changed'])
+
+    def test_present_chained_extendlv_fails(self):
+        self._set_policy_and_size_change()
+        self.responses['chlv'] = (1, '__LVOL_STEP__\n', 'extendlv failed')
+        result = self.execute_module(failed=True)
+        self.assertEqual(result['msg'], 'Logical volume testlv policy changed: minimum. Unable to resize testlv to 1024MB.')
+        self.assertTrue(result['changed'])
+        self.assertEqual(result['out'], '')
@@ -0,0 +1,155 @@
+# (c) 2017, Alain Dejoux <adejoux@djouxtech.net>
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import (absolute_import, division, print_function)
+__metaclass__ = type
+
+import os
+import time
+
+from ansible.compat.tests import unittest
+from ansible.compat.tests.mock import MagicMock, Mock
+from ansible.plugins.action.aix_lvol import ActionModule
+from ansible.playbook.task import Task
+
+
+fixture_path = os.path.join(os.path.dirname(__file__), '..', '..', 'module_utils', 'fixtures', 'aix_lvm')
+fixture_data = {}
+
+
+def load_fixture(name):
+    path = os.path.join(fixture_path, name)
+
+    if path not in fixture_data:
+        with open(path) as f:
+            fixture_data[path] = f.read()
+
+    return fixture_data[path]
+
+
+# testlv is a 512MB logical volume in testvg, with a 16MB PP size
+LSLV_OUTPUT = load_fixture('lslv_testlv.txt')
+LSVG_OUTPUT = load_fixture('lsvg_testvg.txt')
+
+# output of the lsvg and lslv probe run by the action plugin
+PROBE_OUTPUT = LSVG_OUTPUT + "__LVOL_SEP__ 0\n" + LSLV_OUTPUT
+
+
+class TestAixLvolCheckUnchanged(unittest.TestCase):
+
+    def _action(self, **args):
+        task = MagicMock(Task)
+        task.args = dict(vg='testvg', lv='testlv')
+        task.args.update(args)
+        return ActionModule(task, Mock(), Mock(), loader=None, templar=None, shared_loader_obj=None)
+
+    def test_unchanged_without_size(self):
+        self.assertEqual(self._action()._check_unchanged('testvg', 'testlv', LSLV_OUTPUT), "Logical volume testlv already exist.")
+
+    def test_unchanged_same_size(self):
+        for size in ('512M', '500M', '512m'):
+            self.assertIsNotNone(self._action(size=size)._check_unchanged('testvg', 'testlv', LSLV_OUTPUT))
+
+    def test_unchanged_smaller_size_without_shrink(self):
+        self.assertIsNotNone(self._action(size='256M', shrink='no')._check_unchanged('testvg', 'testlv', LSLV_OUTPUT))
+
+    def test_missing_lv(self):
+        self.assertIsNone(self._action()._check_unchanged('testvg', 'testlv', ''))
+
+    def test_vg_mismatch(self):
+        self.assertIsNone(self._action(vg='othervg')._check_unchanged('othervg', 'testlv', LSLV_OUTPUT))
+
+    def test_policy_mismatch(self):
+        self.assertIsNone(self._action(policy='minimum')._check_unchanged('testvg', 'testlv', LSLV_OUTPUT))
+
+    def test_bigger_size(self):
+        self.assertIsNone(self._action(size='1G')._check_unchanged('testvg', 'testlv', LSLV_OUTPUT))
+
+    def test_smaller_size_with_shrink(self):
+        self.assertIsNone(self._action(size='256M')._check_unchanged('testvg', 'testlv', LSLV_OUTPUT))
+        self.assertIsNone(self._action(size='256M', shrink='yes')._check_unchanged('testvg', 'testlv', LSLV_OUTPUT))
+
+    def test_unparsable_size(self):
+        for size in ('5', '1.5G', '10K'):
+            self.assertIsNone(self._action(size=size)._check_unchanged('testvg', 'testlv', LSLV_OUTPUT))
+
+    def test_size_without_unit_as_int(self):
+        self.assertIsNone(self._action(size=512)._check_unchanged('testvg', 'testlv', LSLV_OUTPUT))
+
+
+class TestAixLvolRun(unittest.TestCase):
+
+    def _action(self, rc, stdout, **args):
+        task = MagicMock(Task)
+        task.args = dict(vg='testvg', lv='testlv')
+        task.args.update(args)
+        task.delegate_to = None
+        task.async = 0
+        am = ActionModule(task, Mock(), Mock(), loader=None, templar=None, shared_loader_obj=None)
+        am._low_level_execute_command = Mock(return_value=dict(rc=rc, stdout=stdout))
+        am._execute_module = Mock(return_value=dict(changed=True))
+        return am
+
+    def test_run_skips_module_when_unchanged(self):
+        am = self._action(0, PROBE_OUTPUT, size='512M')
+        result = am.run(task_vars=dict())
+        self.assertFalse(result['changed'])
+        self.assertFalse(am._execute_module.called)
+
+    def test_run_executes_module_when_changed(self):
+        am = self._action(0, PROBE_OUTPUT, size='1G')
+        result = am.run(task_vars=dict())
+        self.assertTrue(result['changed'])
+        module_args = am._execute_module.call_args[1]['module_args']
+        self.assertEqual(module_args['vg_info'], {'name': 'testvg', 'size': 10208, 'free': 9696, 'pp_size': 16})
+
+    def test_run_executes_module_with_int_size(self):
+        am = self._action(0, PROBE_OUTPUT, size=512)
+        am.run(task_vars=dict())
+        self.assertEqual(am._execute_module.call_args[1]['module_args']['size'], 512)
+
+    def test_run_quotes_numeric_names(self):
+        am = self._action(1, '', vg=10, lv=20, size='512M')
+        am.run(task_vars=dict())
+        am._low_level_execute_command.assert_called_with('lsvg -L 10; echo __LVOL_SEP__ $?; lslv -L 20')
+        self.assertTrue(am._execute_module.called)
+
+    def test_run_executes_module_when_absent(self):
+        am = self._action(0, PROBE_OUTPUT, state='absent')
+        am.run(task_vars=dict())
+        self.assertFalse(am._low_level_execute_command.called)
+        self.assertTrue(am._execute_module.called)
+
+    def test_run_uses_cached_vg(self):
+        cache = {'testvg': {'name': 'testvg', 'size': 10208, 'free': 9696, 'pp_size': 16, 'time': time.time()}}
+        am = self._action(0, LSLV_OUTPUT, size='512M')
+        result = am.run(task_vars=dict(aix_lvol_vg_cache=cache))
+        am._low_level_execute_command.assert_called_with('lslv -L testlv')
+        self.assertFalse(result['changed'])
+        self.assertEqual(result['ansible_facts']['aix_lvol_vg_cache'], cache)
+
+    def test_run_drops_cached_vg_on_change(self):
+        cache = {'testvg': {'name': 'testvg', 'size': 10208, 'free': 9696, 'pp_size': 16, 'time': time.time()}}
+        am = self._action(0, LSLV_OUTPUT, size='1G')
+        result = am.run(task_vars=dict(aix_lvol_vg_cache=cache))
+        self.assertEqual(result['ansible_facts']['aix_lvol_vg_cache'], {})
+
+    def test_run_ignores_expired_cached_vg(self):
+        cache = {'testvg': {'name': 'testvg', 'size': 10208, 'free': 50, 'pp_size': 16, 'time': time.time() - 3600}}
+        am = self._action(0, PROBE_OUTPUT, size='512M')
+        result = am.run(task_vars=dict(aix_lvol_vg_cache=cache))
+        self.assertEqual(result['ansible_facts']['aix_lvol_vg_cache']['testvg']['free'], 9696)